@@ -0,0 +1,150 @@
+# script_filters.py
+import ast
+import numpy as np
+
+# Functions that may be called inside a filter expression; each call must pass
+# exactly `nin` positional arguments so a ufunc's `out` slot can never be reached
+FILTER_FUNCTIONS = {
+    'abs': np.abs,
+    'sqrt': np.sqrt,
+    'log': np.log,
+    'minimum': np.minimum,
+    'maximum': np.maximum,
+}
+
+def _truth(value):
+    """Element-wise truth value for and/or/not: non-zero and not NaN."""
+    value = np.asarray(value)
+    if value.dtype == bool:
+        return value
+    return (value != 0) & ~np.isnan(value.astype(float))
+
+
+# Helpers the rewritten expression calls; not reachable from user input
+_EVAL_HELPERS = {'_truth': _truth, '_number': np.float64}
+
+# Syntax accepted from the input sheet. The rewriter emits &, | and ~ itself;
+# users write and/or/not instead, since the bitwise forms fail on float fields
+ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call,
+    ast.Name, ast.Constant, ast.Load,
+    ast.And, ast.Or, ast.Not, ast.USub, ast.UAdd,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+def _call(name, arg):
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=[arg], keywords=[])
+
+
+class _ElementwiseRewriter(ast.NodeTransformer):
+    """
+    Turn and/or/not and chained comparisons into operators that work on whole
+    arrays, and make every number a NumPy float so huge powers overflow to inf
+    instead of being computed with Python integers.
+    """
+
+    def visit_Constant(self, node):
+        return _call('_number', ast.Constant(value=float(node.value)))
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        result = _call('_truth', node.values[0])
+        for value in node.values[1:]:
+            result = ast.BinOp(left=result, op=op, right=_call('_truth', value))
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=_call('_truth', node.operand))
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        result = None
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            part = ast.Compare(left=left, ops=[op], comparators=[right])
+            result = part if result is None else ast.BinOp(left=result, op=ast.BitAnd(), right=part)
+            left = right
+        return result
+
+
+class CompiledFilter:
+    """A filter expression parsed and compiled once, evaluated over whole snapshot columns."""
+    __slots__ = ('expression', 'code', 'names')
+
+    def __init__(self, expression, code, names):
+        self.expression = expression
+        self.code = code
+        self.names = names
+
+    def _run(self, fields):
+        # Read-only views: the fields are usually views into the quote snapshot
+        namespace = {}
+        for name in self.names:
+            values = np.asarray(fields[name]).view()
+            values.flags.writeable = False
+            namespace[name] = values
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return eval(self.code, {'__builtins__': {}, **FILTER_FUNCTIONS, **_EVAL_HELPERS}, namespace)
+
+    def evaluate(self, fields, length):
+        """Return a boolean mask of length `length`; fields maps names to NumPy arrays."""
+        return np.broadcast_to(_truth(self._run(fields)), (length,))
+
+    def evaluate_values(self, fields, length):
+        """Return the expression's numeric value for every row, e.g. for ranking."""
+        return np.broadcast_to(np.asarray(self._run(fields), dtype=float), (length,))
+
+    def __repr__(self):
+        return f"CompiledFilter({self.expression!r})"
+
+
+def compile_filter_expression(expression, field_names):
+    """
+    Validate and compile a filter expression such as
+    `changesPercentage > 2 and 1e8 <= marketCap < 2e9` (or a plain value
+    expression like `volume / avgVolume` used for ranking).
+    Only the given field names, numbers, arithmetic, comparisons, and/or/not
+    and calls to FILTER_FUNCTIONS are accepted; anything else raises ValueError.
+    """
+    text = str(expression).strip().lstrip('=').strip()
+    if not text:
+        raise ValueError("Filter expression is empty")
+    try:
+        tree = ast.parse(text, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid filter expression '{text}': {e.msg}") from None
+
+    names = set()
+    called = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in filter expression '{text}': {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"Only numbers are allowed as constants in filter expression '{text}'")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FILTER_FUNCTIONS or node.keywords:
+                raise ValueError(f"Unsupported function call in filter expression '{text}'")
+            expected = FILTER_FUNCTIONS[node.func.id].nin
+            if len(node.args) != expected:
+                raise ValueError(f"{node.func.id}() takes exactly {expected} argument(s) in filter expression '{text}'")
+        elif isinstance(node, ast.Name) and id(node) not in called:
+            if node.id not in field_names:
+                raise ValueError(f"Unknown field '{node.id}' in filter expression '{text}'. Available fields: {', '.join(field_names)}")
+            names.add(node.id)
+
+    tree = ast.fix_missing_locations(_ElementwiseRewriter().visit(tree))
+    compiled = CompiledFilter(text, compile(tree, '<filter expression>', 'eval'), tuple(sorted(names)))
+    # Dry run on a one-row dummy snapshot so anything that would fail at scan time fails now
+    try:
+        compiled.evaluate_values({name: np.ones(1) for name in compiled.names}, 1)
+    except Exception as e:
+        raise ValueError(f"Filter expression '{text}' cannot be evaluated: {e}") from None
+    return compiled
@@ -0,0 +1,120 @@
+# script_history.py
+import argparse
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+history_db_path = 'results_history.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    run_date TEXT NOT NULL,
+    run_time TEXT NOT NULL,
+    col INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    matched INTEGER NOT NULL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_date_col_symbol ON results (run_date, col, symbol);
+CREATE INDEX IF NOT EXISTS idx_results_symbol_col_date ON results (symbol, col, run_date);
+"""
+
+
+def connect(db_path=None):
+    conn = sqlite3.connect(db_path or history_db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_run(col, matched_symbols, excluded_symbols_with_reasons, run_at=None, db_path=None):
+    """
+    Store one column run: every matched symbol plus every excluded symbol with its reason.
+    All rows go in with a single executemany inside one transaction.
+    """
+    run_at = run_at or datetime.now()
+    run_date = run_at.strftime('%Y-%m-%d')
+    run_time = run_at.strftime('%H:%M:%S')
+    rows = [(run_date, run_time, col, symbol, 1, None) for symbol in matched_symbols]
+    rows.extend((run_date, run_time, col, symbol, 0, reason) for symbol, reason in excluded_symbols_with_reasons)
+    with closing(connect(db_path)) as conn:
+        with conn:
+            conn.executemany(
+                "INSERT INTO results (run_date, run_time, col, symbol, matched, reason) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+    return len(rows)
+
+
+def _where(symbol=None, col=None, since=None, until=None, matched=None):
+    clauses, params = [], []
+    if symbol is not None:
+        clauses.append("symbol = ?")
+        params.append(symbol.strip().upper())
+    if col is not None:
+        clauses.append("col = ?")
+        params.append(col)
+    if since is not None:
+        clauses.append("run_date >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("run_date <= ?")
+        params.append(until)
+    if matched is not None:
+        clauses.append("matched = ?")
+        params.append(1 if matched else 0)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def count_matches(symbol, col=None, since=None, until=None, db_path=None):
+    """Number of runs in which symbol matched (optionally for one column and date range)."""
+    where, params = _where(symbol, col, since, until, matched=True)
+    with closing(connect(db_path)) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+
+def symbol_history(symbol, col=None, since=None, until=None, db_path=None):
+    """All recorded rows for symbol as (run_date, run_time, col, matched, reason), oldest first."""
+    where, params = _where(symbol, col, since, until)
+    query = f"SELECT run_date, run_time, col, matched, reason FROM results{where} ORDER BY run_date, run_time, col"
+    with closing(connect(db_path)) as conn:
+        return conn.execute(query, params).fetchall()
+
+
+def top_symbols(col=None, since=None, until=None, limit=20, db_path=None):
+    """Symbols that matched most often, as (symbol, match_count) pairs."""
+    where, params = _where(None, col, since, until, matched=True)
+    query = f"SELECT symbol, COUNT(*) AS hits FROM results{where} GROUP BY symbol ORDER BY hits DESC, symbol LIMIT ?"
+    with closing(connect(db_path)) as conn:
+        return conn.execute(query, params + [limit]).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the scanner results history")
+    parser.add_argument('--db', default=history_db_path, help="Path to the history database")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    count_parser = subparsers.add_parser('count', help="How often a symbol matched")
+    history_parser = subparsers.add_parser('history', help="Every recorded result for a symbol")
+    for sub in (count_parser, history_parser):
+        sub.add_argument('symbol')
+    top_parser = subparsers.add_parser('top', help="Symbols that matched most often")
+    top_parser.add_argument('--limit', type=int, default=20)
+    for sub in (count_parser, history_parser, top_parser):
+        sub.add_argument('--column', type=int, help="Column number as shown in the logs")
+        sub.add_argument('--since', help="First date to include (YYYY-MM-DD)")
+        sub.add_argument('--until', help="Last date to include (YYYY-MM-DD)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'count':
+        hits = count_matches(args.symbol, args.column, args.since, args.until, db_path=args.db)
+        print(f"{args.symbol.upper()} matched {hits} time(s)")
+    elif args.command == 'history':
+        for run_date, run_time, col, matched, reason in symbol_history(args.symbol, args.column, args.since, args.until, db_path=args.db):
+            print(f"{run_date} {run_time} column {col}: {'matched' if matched else reason}")
+    else:
+        for symbol, hits in top_symbols(args.column, args.since, args.until, args.limit, db_path=args.db):
+            print(f"{symbol}: {hits}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,20 @@ import pandas as pd
 import requests
 import shutil
 from datetime import datetime, timezone
+from enum import IntEnum
+import numpy as np
 import schedule
 import time
 import os
+import sys
+import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import winsound
-import win32com.client
+import script_history
+import script_writer
+import script_filters
+import script_rolling
 
 _sound_enabled = True
 
@@ -39,9 +46,8 @@ def setup_file_monitor(input_excel_file_path):
             schedule.clear()
             
             # Read the updated Excel file
-            input_df = pd.read_excel(input_excel_file_path, header=None)
+            input_df = load_scan_config(input_excel_file_path).input_df
             save_time = str(input_df.iloc[0, 2])
-            total_columns = input_df.shape[1] - 3
             
             # Schedule columns to process at the specified times
             for col in range(3, input_df.shape[1]):
@@ -53,12 +59,12 @@ def setup_file_monitor(input_excel_file_path):
                     try:
                         # Validate time format
                         datetime.strptime(time_str, "%H:%M:%S")
-                        schedule.every().day.at(time_str).do(lambda col=col: process_column(col, total_columns, input_df))
+                        schedule.every().day.at(time_str).do(process_column, col)
                         print(f"Updated schedule: Column {col-2} to run at {time_str}")
                     except ValueError:
                         try:
                             datetime.strptime(time_str, "%H:%M")
-                            schedule.every().day.at(time_str).do(lambda col=col: process_column(col, total_columns, input_df))
+                            schedule.every().day.at(time_str).do(process_column, col)
                             print(f"Updated schedule: Column {col-2} to run at {time_str}")
                         except ValueError:
                             print(f"Invalid time format for column {col-2}: {time_str}")
@@ -97,12 +103,15 @@ def daily_save_and_restart():
         # print(f"Workbook saved at: {output_excel_file_path}")
 
         processed_columns.clear()  # Clear processed columns for the next day
+        rolling_store.reset()
 
         # Generate new file path for the next day
+        output_writer.forget(output_excel_file_path)
         output_excel_file_path = generate_output_file_path()
         print(f"New file generated: {output_excel_file_path}")
 
-        # Reschedule tasks for the next day
+        # Reschedule tasks for the next day; clear first so jobs are not duplicated every day
+        schedule.clear()
         schedule_tasks()
         print("Rescheduled tasks for the next day.")
 
@@ -114,7 +123,8 @@ def daily_save_and_restart():
 def schedule_tasks():
     try:
         # Load Excel file and fetch values
-        input_df = pd.read_excel(input_excel_file_path, header=None)
+        config = load_scan_config(input_excel_file_path)
+        input_df = config.input_df
         save_time = str(input_df.iloc[0, 2])
 
         # Print save time to the console
@@ -132,8 +142,7 @@ def schedule_tasks():
                 print(f"Error: The save time format in Excel is invalid. Expected format HH:MM or HH:MM:SS. Got: {save_time}")
                 return
 
-        total_columns = input_df.shape[1] - 3
-        print("total columns: ", total_columns)
+        print("total columns: ", config.total_columns)
         
         # Schedule columns to process at the specified times
         for col in range(3, input_df.shape[1]):
@@ -144,7 +153,7 @@ def schedule_tasks():
 
             if pd.notna(time_str):
                 try:
-                    schedule.every().day.at(time_str).do(lambda col=col: process_column(col, total_columns, input_df))
+                    schedule.every().day.at(time_str).do(process_column, col)
                     print(f"Scheduled Column {col-2} to run at {time_str}")
                 except Exception as e:
                     print(f"Error scheduling column {col-2} at {time_str}: {e}")
@@ -214,6 +223,179 @@ def read_exclusion_symbols(file_path):
         return []
 
 
+# Function to read the name exclusion words (first column of the exclusion workbook)
+def read_exclusion_strings(file_path):
+    try:
+        return set(pd.read_excel(file_path).iloc[:, 0].dropna().astype(str).str.strip().str.lower())
+    except Exception as e:
+        print(f"Error reading exclusion strings from {file_path}: {e}")
+        return set()
+
+
+# Numeric quote fields kept from the API; these are also the names usable in filter expressions
+QUOTE_FIELDS = (
+    'price', 'volume', 'avgVolume', 'changesPercentage', 'change',
+    'dayLow', 'dayHigh', 'yearLow', 'yearHigh', 'open', 'previousClose',
+    'marketCap', 'priceAvg50', 'priceAvg200', 'eps', 'pe', 'sharesOutstanding',
+)
+
+# One row per symbol; missing numbers are stored as NaN
+QUOTE_DTYPE = np.dtype([('symbol', object), ('name', object)] + [(field, 'f8') for field in QUOTE_FIELDS])
+
+# Fields a filter expression can refer to: every quote field plus derived values
+FILTER_FIELDS = QUOTE_FIELDS + ('ratio',) + script_rolling.ROLLING_FIELDS
+
+# Intraday volume/price history across scheduled runs, cleared at the daily restart
+rolling_store = script_rolling.RollingVolumeStore()
+
+
+def _quote_number(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def build_quote_snapshot(api_data):
+    """
+    Pack API quote dicts into a QUOTE_DTYPE array.
+    Symbols and names are interned so repeated snapshots share the same string objects.
+    """
+    snapshot = np.empty(len(api_data), dtype=QUOTE_DTYPE)
+    for i, item in enumerate(api_data):
+        symbol = item.get('symbol') or ''
+        name = item.get('name')
+        snapshot[i] = (
+            sys.intern(symbol),
+            sys.intern(name) if isinstance(name, str) else None,
+            *(_quote_number(item.get(field)) for field in QUOTE_FIELDS),
+        )
+    return snapshot
+
+
+class ExclusionReason(IntEnum):
+    """Why a symbol was dropped; stored as a small code and only turned into text for the log."""
+    NONE = 0
+    NAME_MATCH = 1
+    MISSING_DATA = 2
+    PRICE = 3
+    VOLUME = 4
+    AVG_VOLUME = 5
+    RATIO = 6
+    TXT_1 = 7
+    TXT_2 = 8
+    FILTER_EXPRESSION = 9
+
+    def render(self, symbol, word=None):
+        if self is ExclusionReason.NAME_MATCH:
+            return f"Symbol '{symbol}' matches exclusion list (word '{word}' matched). Dropping symbol."
+        if self is ExclusionReason.MISSING_DATA:
+            return f"Symbol {symbol} dropped price, min and avg volume."
+        if self is ExclusionReason.PRICE:
+            return f"Symbol {symbol} dropped due to price outside range."
+        if self is ExclusionReason.VOLUME:
+            return f"Symbol {symbol} dropped due to volume outside range."
+        if self is ExclusionReason.AVG_VOLUME:
+            return f"Symbol {symbol} dropped due to average volume outside range."
+        if self is ExclusionReason.RATIO:
+            return f"Symbol {symbol} dropped due to low volume-to-average-volume ratio."
+        if self is ExclusionReason.TXT_1:
+            return f"Symbol {symbol} dropped due to exclusion in {txt_file_1}"
+        if self is ExclusionReason.TXT_2:
+            return f"Symbol {symbol} dropped due to exclusion in {txt_file_2}"
+        if self is ExclusionReason.FILTER_EXPRESSION:
+            return f"Symbol {symbol} dropped by the column filter expression."
+        return f"Symbol {symbol} was not excluded."
+
+
+def _config_cell(input_df, row, col):
+    """Value of an optional setting cell, or None when it is blank or missing."""
+    if row >= input_df.shape[0]:
+        return None
+    value = input_df.iloc[row, col]
+    if pd.isna(value) or not str(value).strip():
+        return None
+    return value
+
+
+class ColumnConfig:
+    """Filter settings of one input column, parsed once per load of the input file."""
+    __slots__ = (
+        'col', 'min_price', 'max_price', 'min_volume', 'max_volume',
+        'min_avg_volume', 'max_avg_volume', 'min_volume_avg_volume',
+        'exclude_txt_1', 'exclude_txt_2', 'filter_expression', 'max_results', 'rank_by',
+    )
+
+    def __init__(self, input_df, col):
+        self.col = col
+        # Reading conditions from DataFrame
+        self.min_price = safe_convert_to_float(input_df.iloc[3, col], 'Minimum Price')
+        self.max_price = safe_convert_to_float(input_df.iloc[4, col], 'Maximum Price')
+        self.min_volume = safe_convert_to_float(input_df.iloc[5, col], 'Minimum Volume')
+        self.max_volume = safe_convert_to_float(input_df.iloc[6, col], 'Maximum Volume')
+        self.min_avg_volume = safe_convert_to_float(input_df.iloc[7, col], 'Minimum Average Volume')
+        self.max_avg_volume = safe_convert_to_float(input_df.iloc[8, col], 'Maximum Average Volume')
+        self.min_volume_avg_volume = safe_convert_to_float(input_df.iloc[9, col], 'Min Volume / Average Volume')
+        # Optional extra condition over the quote fields, e.g. "changesPercentage > 2 and marketCap < 2e9"
+        expression = _config_cell(input_df, 11, col)
+        self.filter_expression = None
+        if expression is not None:
+            self.filter_expression = script_filters.compile_filter_expression(expression, FILTER_FIELDS)
+        # Optional cap on written symbols and the value they are ranked by (highest first)
+        max_results = _config_cell(input_df, 14, col)
+        self.max_results = None
+        if max_results is not None:
+            max_results = safe_convert_to_float(max_results, 'Max Results')
+            if max_results is None or max_results < 1:
+                raise ValueError(f"Max Results for column {col-2} must be a positive number")
+            self.max_results = int(max_results)
+        rank_by = _config_cell(input_df, 17, col)
+        if rank_by is None and self.max_results is not None:
+            rank_by = 'ratio'
+        self.rank_by = None
+        if rank_by is not None:
+            self.rank_by = script_filters.compile_filter_expression(rank_by, FILTER_FIELDS)
+        # Exclude settings in Excel
+        self.exclude_txt_1 = str(input_df.iloc[12, col]).strip().upper() == 'YES'
+        self.exclude_txt_2 = str(input_df.iloc[15, col]).strip().upper() == 'YES'
+
+
+class ScanConfig:
+    """The loaded input file plus the parsed settings of every column, keyed by column id."""
+    __slots__ = ('input_df', 'total_columns', 'columns')
+
+    def __init__(self, input_df):
+        self.input_df = input_df
+        self.total_columns = input_df.shape[1] - 3
+        self.columns = {}
+
+    def column(self, col):
+        if col not in self.columns:
+            self.columns[col] = ColumnConfig(self.input_df, col)
+        return self.columns[col]
+
+
+# Scheduled jobs only carry a column id and look the settings up here, so
+# reloading the input file releases the previous DataFrame
+scan_config = None
+
+
+def load_scan_config(file_path):
+    global scan_config
+    config = ScanConfig(pd.read_excel(file_path, header=None))
+    # Parse every running column now so a bad setting is reported when the file
+    # is loaded rather than at the scheduled scan time
+    for col in range(3, config.input_df.shape[1]):
+        if str(config.input_df.iloc[2, col]).strip().upper() != 'YES':
+            continue
+        try:
+            config.column(col)
+        except Exception as e:
+            print(f"Error in settings for column {col-2}: {e}")
+    scan_config = config
+    return scan_config
+
+
 # Fetch data from API and filter by timestamp
 def fetch_api_data():
     try:
@@ -230,13 +412,13 @@ def fetch_api_data():
             if start_timestamp <= item.get('timestamp', 0) <= end_timestamp
         ]
         print(f"API data fetched for today: {len(filtered_data)} symbols")
-        return filtered_data
+        return build_quote_snapshot(filtered_data)
     except requests.exceptions.RequestException as e:
         print(f"Failed to fetch data from API: {e}")
-        return []
+        return np.empty(0, dtype=QUOTE_DTYPE)
     except Exception as e:
         print(f"Unexpected error in fetch_api_data: {e}")
-        return []
+        return np.empty(0, dtype=QUOTE_DTYPE)
 
 
 # Utility function to safely convert strings to floats
@@ -248,42 +430,6 @@ def safe_convert_to_float(value, description):
         return None
 
 
-def check_and_drop_symbol_if_match(symbol, name, input_df, col, exclusion_excel_file):
-    try:
-        # Check if 'name' is None, and proceed without adding to exclusion list
-        if name is None:
-            return False
-        
-        # Load matching strings from the Excel file (assuming strings are in the first column)
-        matching_strings = pd.read_excel(exclusion_excel_file).iloc[:, 0].dropna().str.strip().str.lower().tolist()
-        
-        # Split the name into words and convert them to lowercase
-        name_list = name.split() if name else []  # Avoid split() on None or empty string
-        name_list = [word.strip().lower() for word in name_list]  # Clean the words
-        
-        # Check if any word in name_list matches a string in matching_strings
-        for word in name_list:
-            if word in matching_strings:
-                # Optional: Save excluded symbol to a file
-                exclusion_file_name = f'Logs/excluded_symbols_column_{col-2}.txt'
-                with open(exclusion_file_name, 'a') as f:
-                    f.write(f"Symbol '{symbol}' matches exclusion list (word '{word}' matched). Dropping symbol.\n")  # Log the excluded symbol to the file
-                
-                return True  # Symbol should be excluded
-        
-        # If no match is found, return False (don't exclude the symbol)
-        return False
-
-    except Exception as e:
-        print(f"Error checking symbol '{symbol}': {e}")
-        return False
-
-def is_file_open(file_path):
-    try:
-        with open(file_path, 'r+'):  # Try opening the file in read+write mode
-            return False  
-    except IOError:
-        return True  
 # Function to process a specific column in the Excel file
 
 def fetch_stock_splits():
@@ -309,98 +455,137 @@ def fetch_stock_splits():
         return {}
 
 
-def process_column(col, total_columns, input_df):
+def select_top_k(scores, k):
+    """
+    Indices of the k highest scores, best first (NaN ranks last).
+    argpartition finds the k candidates in linear time so only those k get sorted.
+    """
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def process_column(col):
     global output_excel_file_path
+    config = scan_config
     try:
-        # If this is not the first column, read the existing output file
-        
+        input_df = config.input_df
+        settings = config.column(col)
         stock_splits = fetch_stock_splits()
-        # Reading conditions from DataFrame
-        min_price = safe_convert_to_float(input_df.iloc[3, col], 'Minimum Price')
-        max_price = safe_convert_to_float(input_df.iloc[4, col], 'Maximum Price')
-        min_volume = safe_convert_to_float(input_df.iloc[5, col], 'Minimum Volume')
-        max_volume = safe_convert_to_float(input_df.iloc[6, col], 'Maximum Volume')
-        min_avg_volume = safe_convert_to_float(input_df.iloc[7, col], 'Minimum Average Volume')
-        max_avg_volume = safe_convert_to_float(input_df.iloc[8, col], 'Maximum Average Volume')
-        min_volume_avg_volume = safe_convert_to_float(input_df.iloc[9, col], 'Min Volume / Average Volume')
-        print(f"\nConditions for column {col-2}: {min_price}, {max_price}, {min_volume}, {max_volume}, {min_avg_volume}, {max_avg_volume}, {min_volume_avg_volume}")
-        # Exclude settings in Excel
-        exclude_txt_1 = str(input_df.iloc[12, col]).strip().upper() == 'YES'
-        exclude_txt_2 = str(input_df.iloc[15, col]).strip().upper() == 'YES'
-        print(f"Exclusion settings for column {col-2}: {exclude_txt_1}, {exclude_txt_2}")
+        print(f"\nConditions for column {col-2}: {settings.min_price}, {settings.max_price}, {settings.min_volume}, {settings.max_volume}, {settings.min_avg_volume}, {settings.max_avg_volume}, {settings.min_volume_avg_volume}")
+        print(f"Exclusion settings for column {col-2}: {settings.exclude_txt_1}, {settings.exclude_txt_2}")
+        if settings.filter_expression is not None:
+            print(f"Filter expression for column {col-2}: {settings.filter_expression.expression}")
+        if settings.rank_by is not None:
+            print(f"Ranking for column {col-2}: top {settings.max_results or 'all'} by {settings.rank_by.expression}")
 
         exclusion_symbols_1 = set(symbol.strip().upper() for symbol in read_exclusion_symbols(txt_file_1))
         exclusion_symbols_2 = set(symbol.strip().upper() for symbol in read_exclusion_symbols(txt_file_2))
+        exclusion_strings = read_exclusion_strings(exclusion_excel_file)
         # Fetch API data
-        api_data = fetch_api_data()
-        if not api_data:
+        snapshot = fetch_api_data()
+        if len(snapshot) == 0:
             print("No data fetched from API.")
             return
 
-        matched_symbols = []
-        excluded_symbols_with_reasons = []
-
-        for data in api_data:
-            symbol = data.get('symbol')
-            name = data.get('name')
-            price = data.get('price')
-            min_volume_api = data.get('volume')
-            avg_volume_api = data.get('avgVolume')
-            if check_and_drop_symbol_if_match(symbol, name, input_df, col, exclusion_excel_file):
-                continue  # If the symbol was dropped, skip the rest of the processing
-            
-            if symbol in stock_splits:
-                split_info = stock_splits[symbol]
-                numerator = split_info['numerator']
-                denominator = split_info['denominator']
-                adjusted_price = (denominator / numerator) * price
-                print(f"Stock split detected for {symbol}. Original price: {price}, Adjusted price: {adjusted_price}")
-                price = adjusted_price
-
-            # Apply the conditions
-            if price and min_volume_api and avg_volume_api:
-                if min_price < price < max_price:
-                    if min_volume < min_volume_api < max_volume:
-                        if min_avg_volume < avg_volume_api < max_avg_volume:
-                            if (min_volume_api / avg_volume_api) >= min_volume_avg_volume:
-                                if exclude_txt_1 and symbol.strip().upper() in exclusion_symbols_1:
-                                    reason = f"Symbol {symbol} dropped due to exclusion in {txt_file_1}"
-                                    excluded_symbols_with_reasons.append((symbol, reason))
-                                    continue
-                                if exclude_txt_2 and symbol.strip().upper() in exclusion_symbols_2:
-                                    reason = f"Symbol {symbol} dropped due to exclusion in {txt_file_2}"
-                                    excluded_symbols_with_reasons.append((symbol, reason))
-                                    continue
-                                matched_symbols.append(symbol)
-                            else:
-                                reason = f"Symbol {symbol} dropped due to low volume-to-average-volume ratio."
-                                excluded_symbols_with_reasons.append((symbol, reason))
-                        else:
-                            reason = f"Symbol {symbol} dropped due to average volume outside range."
-                            excluded_symbols_with_reasons.append((symbol, reason))
-                    else:
-                        reason = f"Symbol {symbol} dropped due to volume outside range."
-                        excluded_symbols_with_reasons.append((symbol, reason))
-                else:
-                    reason = f"Symbol {symbol} dropped due to price outside range."
-                    excluded_symbols_with_reasons.append((symbol, reason))
-            else:
-                reason = f"Symbol {symbol} dropped price, min and avg volume."
-                excluded_symbols_with_reasons.append((symbol, reason))
+        symbols = snapshot['symbol']
+        price = snapshot['price']
+        volume = snapshot['volume']
+        avg_volume = snapshot['avgVolume']
+
+        if stock_splits:
+            positions = {symbol: i for i, symbol in enumerate(symbols)}
+            for symbol, split_info in stock_splits.items():
+                i = positions.get(symbol)
+                if i is None:
+                    continue
+                adjusted_price = (split_info['denominator'] / split_info['numerator']) * price[i]
+                print(f"Stock split detected for {symbol}. Original price: {price[i]}, Adjusted price: {adjusted_price}")
+                price[i] = adjusted_price
+
+        store_rows = rolling_store.update(symbols, volume, price, avg_volume, time.time())
+
+        name_match = np.fromiter(
+            (bool(name) and not exclusion_strings.isdisjoint(name.lower().split()) for name in snapshot['name']),
+            dtype=bool, count=len(snapshot),
+        )
+        missing = np.isnan(price) | np.isnan(volume) | np.isnan(avg_volume) | (price == 0) | (volume == 0) | (avg_volume == 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = volume / avg_volume
+        in_txt_1 = np.zeros(len(snapshot), dtype=bool)
+        in_txt_2 = np.zeros(len(snapshot), dtype=bool)
+        if settings.exclude_txt_1:
+            in_txt_1 = np.fromiter((symbol.strip().upper() in exclusion_symbols_1 for symbol in symbols), dtype=bool, count=len(snapshot))
+        if settings.exclude_txt_2:
+            in_txt_2 = np.fromiter((symbol.strip().upper() in exclusion_symbols_2 for symbol in symbols), dtype=bool, count=len(snapshot))
+        fields = {field: snapshot[field] for field in QUOTE_FIELDS}
+        fields['ratio'] = ratio
+        fields.update(rolling_store.metrics_for(store_rows))
+        expression_failed = np.zeros(len(snapshot), dtype=bool)
+        if settings.filter_expression is not None:
+            expression_failed = ~settings.filter_expression.evaluate(fields, len(snapshot))
+
+        # Apply the conditions; the first failing check is the recorded reason
+        reasons = np.select(
+            [
+                name_match,
+                missing,
+                ~((settings.min_price < price) & (price < settings.max_price)),
+                ~((settings.min_volume < volume) & (volume < settings.max_volume)),
+                ~((settings.min_avg_volume < avg_volume) & (avg_volume < settings.max_avg_volume)),
+                ~(ratio >= settings.min_volume_avg_volume),
+                expression_failed,
+                in_txt_1,
+                in_txt_2,
+            ],
+            [
+                ExclusionReason.NAME_MATCH,
+                ExclusionReason.MISSING_DATA,
+                ExclusionReason.PRICE,
+                ExclusionReason.VOLUME,
+                ExclusionReason.AVG_VOLUME,
+                ExclusionReason.RATIO,
+                ExclusionReason.FILTER_EXPRESSION,
+                ExclusionReason.TXT_1,
+                ExclusionReason.TXT_2,
+            ],
+            default=ExclusionReason.NONE,
+        ).astype(np.int8)
+
+        matched = reasons == ExclusionReason.NONE
+        matched_symbols = symbols[matched].tolist()
+        excluded_symbols = symbols[~matched]
+        excluded_names = snapshot['name'][~matched]
+        excluded_reasons = reasons[~matched]
+
+        # Only the best ranked matches go into the workbook, most relevant first
+        output_symbols = matched_symbols
+        if settings.rank_by is not None and matched_symbols:
+            matched_fields = {field: values[matched] for field, values in fields.items()}
+            scores = settings.rank_by.evaluate_values(matched_fields, len(matched_symbols))
+            top = select_top_k(scores, settings.max_results or len(matched_symbols))
+            output_symbols = symbols[matched][top].tolist()
+            print(f"Writing top {len(output_symbols)} of {len(matched_symbols)} matched symbols for column {col-2}")
 
         # Calculate required number of rows
         print(f"Matched symbols for column {col-2}: {len(matched_symbols)}")
-        required_rows = max(len(input_df), 18 + len(matched_symbols))
+        required_rows = max(len(input_df), 18 + len(output_symbols))
         
         # If this is the first column, create new DataFrame, otherwise use existing
         if col == 0:
             output_df = pd.DataFrame(index=range(required_rows), columns=input_df.columns)
             output_df.iloc[:18] = input_df.iloc[:18]  # Copy configuration rows
         else:
-            if col > 0 and os.path.exists(output_excel_file_path): #type: ignore
+            # Prefer the snapshot already handed to the writer; it may not be on disk yet
+            out_df = output_writer.latest_snapshot(output_excel_file_path)
+            if out_df is None and os.path.exists(output_excel_file_path): #type: ignore
                 out_df = pd.read_excel(output_excel_file_path)
-                in_df= input_df.copy()
-                in_df= in_df.iloc[:18]
+            if out_df is not None:
+                # The input sheet may have fewer than 18 rows; pad so results stay at row 18
+                in_df= input_df.iloc[:18].reindex(range(18))
                 out_df= out_df.iloc[18:]
                 new_df = pd.concat([in_df, out_df], ignore_index=True)
             else:
@@ -415,24 +600,38 @@ def process_column(col, total_columns, input_df):
         output_df.iloc[18:, col] = None
         
         # Write the matched symbols to specific rows starting from row 18
-        for idx, symbol in enumerate(matched_symbols, start=18):
+        for idx, symbol in enumerate(output_symbols, start=18):
             output_df.iloc[idx, col] = symbol
             
-        # Save the modified DataFrame to Excel using the new retry function
-        # instead of forcibly closing Excel
-        output_excel_file_path = save_excel_with_retry(output_df, output_excel_file_path)
-        print(f"\nColumn {col-2} data saved successfully in {output_excel_file_path}")
+        # Hand the DataFrame to the background writer so a workbook left open
+        # in Excel never holds up the scan
+        output_writer.submit(output_df, output_excel_file_path)
+        print(f"\nColumn {col-2} data queued for saving in {output_excel_file_path}")
 
         # Save the excluded symbols with reasons to a separate text file for each column
         exclusion_file_name = f'Logs/excluded_symbols_column_{col-2}.txt'
         with open(exclusion_file_name, 'w') as exclusion_file:
             exclusion_file.write(f"Exclusion report for column {col-2}\n")
             exclusion_file.write("=" * 50 + "\n")
-            for symbol, reason in excluded_symbols_with_reasons:
-                exclusion_file.write(f"Symbol: {symbol}, Reason: {reason}\n")
+            for symbol, name, reason in zip(excluded_symbols, excluded_names, excluded_reasons):
+                word = None
+                if reason == ExclusionReason.NAME_MATCH:
+                    # Only stored as a code; look the matching word up again for the log line
+                    word = next(word for word in name.lower().split() if word in exclusion_strings)
+                exclusion_file.write(f"Symbol: {symbol}, Reason: {ExclusionReason(reason).render(symbol, word)}\n")
 
         print(f"Excluded symbols with reasons logged in '{exclusion_file_name}'")
 
+        # Keep an indexed history of this run alongside the daily workbook
+        try:
+            recorded = script_history.record_run(
+                col-2, matched_symbols,
+                ((symbol, ExclusionReason(reason).name) for symbol, reason in zip(excluded_symbols, excluded_reasons)),
+            )
+            print(f"Recorded {recorded} results for column {col-2} in '{script_history.history_db_path}'")
+        except Exception as e:
+            print(f"Error recording results history for column {col-2}: {e}")
+
         if _sound_enabled:  # Only play sound if enabled
             winsound.PlaySound('sound.wav', winsound.SND_FILENAME)
 
@@ -440,80 +639,16 @@ def process_column(col, total_columns, input_df):
         print(f"Error processing column {col-2}: {e}")
     finally:
         processed_columns.add(col)
-        if len(processed_columns) >= total_columns:
+        if len(processed_columns) >= config.total_columns:
             print("All columns processed for today ... waiting for next day.")
             schedule.clear()  # Clear the current schedule for the day
+            output_writer.forget(output_excel_file_path)
             output_excel_file_path = generate_output_file_path()  # Generate new file for next day
+            rolling_store.reset()
             schedule_tasks()
 
-def save_excel_with_retry(df, file_path, max_retries=5, retry_delay=2):
-    """
-    Save DataFrame to Excel with retry logic and specific Excel file closing.
-    
-    Args:
-        df: DataFrame to save
-        file_path: Target file path
-        max_retries: Maximum number of retry attempts
-        retry_delay: Seconds to wait between retries
-    
-    Returns:
-        The actual file path where the data was saved
-    """
-    retry_count = 0
-    
-    while retry_count < max_retries:
-        try:
-            # Attempt to save the file
-            df.to_excel(file_path, index=False)
-            print(f"Successfully saved data to {file_path}")
-            return file_path
-            
-        except PermissionError:
-            # File is locked by another process
-            retry_count += 1
-            print(f"File {file_path} is currently in use. Attempt {retry_count}/{max_retries}")
-            
-            if retry_count == 2:  # Try to close specific Excel file on second attempt
-                try:
-                    # Get absolute path to the file
-                    abs_path = os.path.abspath(file_path)
-                    
-                    # Connect to Excel application
-                    excel = win32com.client.GetObject(Class="Excel.Application")
-                    
-                    # Loop through open workbooks
-                    for wb in excel.Workbooks:
-                        if wb.FullName.lower() == abs_path.lower():
-                            print(f"Found open workbook: {wb.Name} - Closing it")
-                            wb.Close(SaveChanges=False)
-                            print(f"Successfully closed the specific workbook")
-                            break
-                    
-                    # Don't quit Excel itself, just release the COM object
-                    excel = None
-                    
-                except Exception as e:
-                    print(f"Could not close specific Excel file: {e}")
-            
-            # Wait before retrying
-            print(f"Waiting {retry_delay} seconds before retry...")
-            time.sleep(retry_delay)
-        
-        except Exception as e:
-            print(f"Unexpected error saving file: {e}")
-            raise
-    
-    # If all retries fail, still try once more after a longer wait
-    print(f"All retries failed. Waiting 5 seconds for final attempt...")
-    time.sleep(5)
-    
-    try:
-        df.to_excel(file_path, index=False)
-        print(f"Successfully saved data to {file_path} on final attempt")
-        return file_path
-    except Exception as e:
-        print(f"Final attempt failed: {e}")
-        raise
+
+output_writer = script_writer.ExcelWriteBehind()
 
 # Run the scheduler
 def run_scheduler(stop_event):
@@ -539,8 +674,8 @@ def run_scheduler(stop_event):
         if 'observer' in locals():
             observer.stop()
             observer.join()
+        output_writer.close()
 
 if __name__ == "__main__":
-    import threading
     stop_event = threading.Event()
     run_scheduler(stop_event)
\ No newline at end of file
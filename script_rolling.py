@@ -0,0 +1,135 @@
+# script_rolling.py
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+# Metrics published to filter and rank expressions
+ROLLING_FIELDS = ('relVolume', 'volumeVelocity', 'volumeAcceleration', 'priceVelocity')
+
+MARKET_TZ = ZoneInfo('America/New_York')
+SESSION_OPEN = (9, 30)
+SESSION_MINUTES = 390
+MIN_SESSION_MINUTES = 15  # Floor for the elapsed-session fraction so the first minutes do not explode
+
+
+def session_fraction(timestamp):
+    """Share of the regular US session elapsed at `timestamp`, clamped to [15 min, 1]."""
+    now = datetime.fromtimestamp(timestamp, MARKET_TZ)
+    session_open = now.replace(hour=SESSION_OPEN[0], minute=SESSION_OPEN[1], second=0, microsecond=0)
+    elapsed = (now - session_open).total_seconds() / 60
+    return min(max(elapsed, MIN_SESSION_MINUTES), SESSION_MINUTES) / SESSION_MINUTES
+
+
+class RollingVolumeStore:
+    """
+    Volume and price of every symbol over the last `capacity` snapshots.
+
+    Rows are symbols, columns are ring-buffer slots, so memory is fixed per
+    symbol no matter how long the scanner runs. Each update writes one slot and
+    recomputes the metrics of the updated symbols over the whole window with
+    array operations, i.e. O(symbols x capacity) per snapshot.
+    """
+
+    def __init__(self, capacity=8, min_interval=5.0):
+        self.capacity = capacity
+        self.min_interval = min_interval  # Snapshots closer than this replace the latest slot
+        self.reset()
+
+    def reset(self):
+        """Forget all history, e.g. when a new trading day starts."""
+        self.index = pd.Index([], dtype=object)
+        self.times = np.full(self.capacity, np.nan)
+        self.head = -1  # Slot holding the latest snapshot
+        self.count = 0
+        self.volume = np.full((0, self.capacity), np.nan)
+        self.price = np.full((0, self.capacity), np.nan)
+        self.metrics = {field: np.full(0, np.nan) for field in ROLLING_FIELDS}
+
+    def _rows_for(self, symbols):
+        rows = self.index.get_indexer(symbols)
+        unknown = rows < 0
+        if unknown.any():
+            new_symbols = pd.unique(np.asarray(symbols, dtype=object)[unknown])
+            self.index = self.index.append(pd.Index(new_symbols, dtype=object))
+            self._grow(len(self.index))
+            rows = self.index.get_indexer(symbols)
+        return rows
+
+    def _grow(self, size):
+        current = self.volume.shape[0]
+        if size <= current:
+            return
+        size = max(size, current * 2)
+        extra = size - current
+        self.volume = np.vstack([self.volume, np.full((extra, self.capacity), np.nan)])
+        self.price = np.vstack([self.price, np.full((extra, self.capacity), np.nan)])
+        for field in ROLLING_FIELDS:
+            self.metrics[field] = np.concatenate([self.metrics[field], np.full(extra, np.nan)])
+
+    def update(self, symbols, volume, price, avg_volume, timestamp):
+        """
+        Add one snapshot and refresh the metrics of the symbols in it.
+        Returns the store rows of `symbols`, to be passed to metrics_for().
+        """
+        rows = self._rows_for(symbols)
+        volume = np.asarray(volume, dtype=float)
+        price = np.asarray(price, dtype=float)
+        avg_volume = np.asarray(avg_volume, dtype=float)
+
+        replace_latest = self.count > 0 and timestamp - self.times[self.head] < self.min_interval
+        if not replace_latest:
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.volume[:, self.head] = np.nan
+            self.price[:, self.head] = np.nan
+        self.times[self.head] = timestamp
+        self.volume[rows, self.head] = volume
+        self.price[rows, self.head] = price
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Cumulative volume relative to what an average day has traded by this time
+            self.metrics['relVolume'][rows] = volume / (avg_volume * session_fraction(timestamp))
+            window_velocity, acceleration, price_velocity = self._window_metrics(rows, volume, price, avg_volume, timestamp)
+        self.metrics['volumeVelocity'][rows] = window_velocity
+        self.metrics['volumeAcceleration'][rows] = acceleration
+        self.metrics['priceVelocity'][rows] = price_velocity
+        return rows
+
+    def _window_metrics(self, rows, volume, price, avg_volume, timestamp):
+        """Volume velocity, its acceleration and price velocity of `rows` over every buffered snapshot."""
+        nan = np.full(len(rows), np.nan)
+        if self.count < 2:
+            return nan, nan, nan
+
+        # Earlier samples of the updated symbols, oldest first
+        slots = (self.head - np.arange(self.count - 1, 0, -1)) % self.capacity
+        past_volume = self.volume[rows][:, slots]
+        past_price = self.price[rows][:, slots]
+        minutes = (timestamp - self.times[slots]) / 60
+        positions = np.arange(len(slots))
+        picked = np.arange(len(rows))
+
+        # Volume is cumulative for the day; a sample above the current value means the
+        # feed reset its counter, so nothing up to that sample can be used
+        above = past_volume > volume[:, None]
+        last_above = np.where(above.any(axis=1), len(slots) - 1 - np.argmax(above[:, ::-1], axis=1), -1)
+        usable = ~np.isnan(past_volume) & (positions > last_above[:, None])
+        has_base = usable.any(axis=1)
+        base = np.argmax(usable, axis=1)  # Oldest usable sample
+
+        average_pace = avg_volume / SESSION_MINUTES
+        # Volume traded per minute across the window, relative to the average day's pace
+        window_velocity = (volume - past_volume[picked, base]) / minutes[base] / average_pace
+        window_velocity = np.where(has_base, window_velocity, np.nan)
+        # Latest interval against the whole window: positive when trading speeds up
+        recent_velocity = (volume - past_volume[:, -1]) / minutes[-1] / average_pace
+        acceleration = np.where(usable[:, -1] & (base < len(slots) - 1), recent_velocity - window_velocity, np.nan)
+        # Percent price change per minute across the window
+        base_price = past_price[picked, base]
+        price_velocity = np.where(has_base, (price - base_price) / base_price * 100 / minutes[base], np.nan)
+        return window_velocity, acceleration, price_velocity
+
+    def metrics_for(self, rows):
+        """The rolling metrics of the given store rows, keyed by field name."""
+        return {field: values[rows] for field, values in self.metrics.items()}
@@ -0,0 +1,124 @@
+# script_writer.py
+import os
+import tempfile
+import threading
+
+
+class ExcelWriteBehind:
+    """
+    Background writer for output workbooks.
+
+    Callers hand over a finished DataFrame with submit() and return immediately.
+    Only the newest pending snapshot per target is kept, so several columns
+    finishing close together result in a single write. Each write goes to a
+    temporary file next to the target and is renamed into place; if the target
+    is locked (e.g. open in Excel) the data goes to a versioned sibling instead.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = {}  # target path -> newest DataFrame not yet written
+        self.latest = {}  # target path -> newest DataFrame submitted
+        self.saved_paths = {}  # target path -> file the last write landed in
+        self.forgotten = set()  # targets to drop from latest/saved_paths once their write finishes
+        self.writing = None  # target currently being written by the thread
+        self.thread = None
+        self.stopping = False
+
+    def submit(self, df, file_path):
+        with self.condition:
+            if file_path in self.pending:
+                print(f"Coalescing pending write for {file_path}")
+            self.pending[file_path] = df
+            self.latest[file_path] = df
+            self.forgotten.discard(file_path)
+            if self.thread is None:
+                self.stopping = False
+                self.thread = threading.Thread(target=self._run, name="ExcelWriteBehind", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def latest_snapshot(self, file_path):
+        """Return the newest DataFrame submitted for file_path, written or not."""
+        with self.condition:
+            return self.latest.get(file_path)
+
+    def forget(self, file_path):
+        """
+        Drop everything kept for a target once nothing will write to it again.
+        A write still queued or in progress is finished first and cleaned up afterwards.
+        """
+        with self.condition:
+            self.saved_paths.pop(file_path, None)
+            if file_path in self.pending or file_path == self.writing:
+                self.forgotten.add(file_path)
+            else:
+                self.latest.pop(file_path, None)
+
+    def close(self, timeout=None):
+        """Write out everything still pending and stop the writer thread."""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+            thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+                if not self.pending:
+                    self.thread = None
+                    return
+                file_path, df = self.pending.popitem()
+                self.writing = file_path
+            try:
+                saved_path = self._write(df, file_path)
+                with self.condition:
+                    self.saved_paths[file_path] = saved_path
+                print(f"Successfully saved data to {saved_path}")
+            except Exception as e:
+                print(f"Error saving {file_path}: {e}")
+            finally:
+                with self.condition:
+                    self.writing = None
+                    if file_path in self.forgotten and file_path not in self.pending:
+                        self.forgotten.discard(file_path)
+                        self.latest.pop(file_path, None)
+                        self.saved_paths.pop(file_path, None)
+
+    def _write(self, df, file_path):
+        directory = os.path.dirname(os.path.abspath(file_path))
+        base_name = os.path.basename(file_path)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{base_name}.", suffix=".tmp.xlsx", dir=directory)
+        os.close(fd)
+        try:
+            df.to_excel(temp_path, index=False)
+            # Keep using the sibling we already fell back to, then look for a new one
+            candidates = [file_path]
+            previous = self.saved_paths.get(file_path)
+            if previous and previous != file_path:
+                candidates.append(previous)
+            for candidate in candidates:
+                try:
+                    os.replace(temp_path, candidate)
+                    return candidate
+                except PermissionError:
+                    print(f"File {candidate} is currently in use.")
+            candidate = next_versioned_path(file_path)
+            os.replace(temp_path, candidate)
+            return candidate
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def next_versioned_path(file_path):
+    """Return the first unused sibling of file_path named <stem>_<n><ext>."""
+    stem, ext = os.path.splitext(file_path)
+    version = 2
+    while os.path.exists(f"{stem}_{version}{ext}"):
+        version += 1
+    return f"{stem}_{version}{ext}"
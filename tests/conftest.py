@@ -0,0 +1,68 @@
+import os
+import shutil
+import sys
+import time
+import types
+
+import pytest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+# winsound only exists on Windows; script_main imports it at module level
+if 'winsound' not in sys.modules and sys.platform != 'win32':
+    winsound = types.ModuleType('winsound')
+    winsound.SND_FILENAME = 0x20000
+    winsound.PlaySound = lambda sound, flags: None
+    sys.modules['winsound'] = winsound
+
+
+def fake_api_data(count=2000):
+    # Fresh strings on every call, like a decoded JSON response
+    now = int(time.time())
+    return [
+        {
+            'symbol': ''.join(['S', str(i)]),
+            'name': ' '.join(['Company', str(i), 'Inc']),
+            'price': 5 + (i % 200),
+            'volume': 1000 + (i * 37) % 50000,
+            'avgVolume': 1500 + (i * 13) % 20000,
+            'changesPercentage': (i % 11) - 5,
+            'marketCap': 1e6 * (i % 500 + 1),
+            'timestamp': now,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    """
+    script_main running offline in tmp_path with copies of the shipped input files.
+    Set `api_data` on the returned namespace to control what the API returns
+    (otherwise `symbol_count` generated quotes); `day` numbers the generated
+    output workbooks.
+    """
+    import script_history
+    import script_main
+    import schedule
+
+    for name in ('Input File.xlsx', 'excluded_strings.xlsx', 'list1.txt', 'list2.txt'):
+        shutil.copy(os.path.join(PACKAGE_DIR, name), tmp_path)
+    (tmp_path / 'Logs').mkdir()
+    monkeypatch.chdir(tmp_path)
+
+    state = types.SimpleNamespace(day=0, api_data=None, symbol_count=2000)
+    monkeypatch.setattr(script_history, 'history_db_path', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(script_main, 'fetch_api_data', lambda: script_main.build_quote_snapshot(state.api_data or fake_api_data(state.symbol_count)))
+    monkeypatch.setattr(script_main, 'fetch_stock_splits', lambda: {})
+    monkeypatch.setattr(script_main, 'generate_output_file_path', lambda: f"day{state.day:03d}_VOLvsAVGVOL.xlsx")
+    monkeypatch.setattr(script_main, 'output_excel_file_path', script_main.generate_output_file_path())
+    schedule.clear()
+    script_main.processed_columns.clear()
+    script_main.rolling_store.reset()
+    yield state
+    script_main.output_writer.close()
+    schedule.clear()
+    script_main.processed_columns.clear()
+    script_main.rolling_store.reset()
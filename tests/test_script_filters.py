@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import script_filters
+
+FIELDS = ('price', 'volume', 'changesPercentage')
+
+
+@pytest.fixture
+def fields():
+    return {
+        'price': np.array([1.0, 0.0, np.nan, 5.0]),
+        'volume': np.array([0.0, 2.0, 3.0, np.nan]),
+        'changesPercentage': np.array([-3.0, 1.0, 2.5, 4.0]),
+    }
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('price > 0', [True, False, False, True]),
+    ('1 < price <= 5', [False, False, False, True]),
+    ('changesPercentage > 2 and not (price > 2)', [False, False, True, False]),
+    ('not volume', [True, False, False, True]),
+    ('volume and price', [False, False, False, False]),
+    ('price or volume', [True, True, True, True]),
+    ('abs(changesPercentage) >= 3', [True, False, False, True]),
+    ('=price > 0', [True, False, False, True]),
+    ('9**9**9 > 1', [True, True, True, True]),
+    ('price', [True, False, False, True]),
+    ('volume', [False, True, True, False]),
+    ('price and 1', [True, False, False, True]),
+    ('1', [True, True, True, True]),
+])
+def test_expressions_evaluate_over_whole_arrays(fields, expression, expected):
+    compiled = script_filters.compile_filter_expression(expression, FIELDS)
+    assert compiled.evaluate(fields, 4).tolist() == expected
+
+
+def test_value_expression_for_ranking(fields):
+    compiled = script_filters.compile_filter_expression('changesPercentage * 2', FIELDS)
+    assert compiled.evaluate_values(fields, 4).tolist() == [-6.0, 2.0, 5.0, 8.0]
+    assert compiled.names == ('changesPercentage',)
+
+
+@pytest.mark.parametrize('expression', [
+    '',
+    'price >',
+    'foo > 1',
+    'abs > 1',
+    'abs(abs) > 1',
+    '_truth(price)',
+    'price(1) > 0',
+    '__import__("os")',
+    'price.real > 1',
+    'price if volume else 0',
+    '"a" == price',
+    'abs(price, out=volume)',
+    'abs(price, volume) > 0',
+    'sqrt(price, volume) > 0',
+    'minimum(price, 1, volume) > 0',
+    'abs() > 0',
+    'sqrt(price, price, price)',
+    'price & volume',
+    '~price',
+    'price | 1',
+])
+def test_invalid_expressions_are_rejected_at_compile_time(expression):
+    with pytest.raises(ValueError):
+        script_filters.compile_filter_expression(expression, FIELDS)
+
+
+def test_evaluation_cannot_write_into_the_fields(fields):
+    volume = fields['volume'].copy()
+    # Built by hand: compile_filter_expression rejects the extra `out` argument
+    compiled = script_filters.CompiledFilter('sqrt(price, volume)', compile('sqrt(price, volume)', '<test>', 'eval'), ('price', 'volume'))
+    with pytest.raises(ValueError):
+        compiled.evaluate(fields, 4)
+    np.testing.assert_array_equal(fields['volume'], volume)
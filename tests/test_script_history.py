@@ -0,0 +1,71 @@
+import sqlite3
+from datetime import datetime
+
+import script_history
+
+
+def test_record_run_inserts_all_rows_in_one_transaction(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'history.db')
+    statements = []
+    real_connect = script_history.connect
+
+    def tracing_connect(path=None):
+        conn = real_connect(path)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(script_history, 'connect', tracing_connect)
+    recorded = script_history.record_run(
+        4, ['AAA', 'BBB'], [('CCC', 'PRICE'), ('DDD', 'RATIO')],
+        run_at=datetime(2026, 10, 1, 9, 45), db_path=db_path,
+    )
+
+    assert recorded == 4
+    assert sum(statement.startswith('BEGIN') for statement in statements) == 1
+    assert sum(statement.startswith('COMMIT') for statement in statements) == 1
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT run_date, run_time, col, symbol, matched, reason FROM results ORDER BY symbol").fetchall()
+    assert rows == [
+        ('2026-10-01', '09:45:00', 4, 'AAA', 1, None),
+        ('2026-10-01', '09:45:00', 4, 'BBB', 1, None),
+        ('2026-10-01', '09:45:00', 4, 'CCC', 0, 'PRICE'),
+        ('2026-10-01', '09:45:00', 4, 'DDD', 0, 'RATIO'),
+    ]
+
+
+def _seed(db_path):
+    script_history.record_run(1, ['AAA', 'BBB'], [], run_at=datetime(2026, 9, 30, 9, 45), db_path=db_path)
+    script_history.record_run(1, ['AAA'], [('BBB', 'VOLUME')], run_at=datetime(2026, 10, 1, 9, 45), db_path=db_path)
+    script_history.record_run(2, ['AAA'], [], run_at=datetime(2026, 10, 2, 10, 0), db_path=db_path)
+
+
+def test_queries_filter_by_date_column_and_symbol(tmp_path):
+    db_path = str(tmp_path / 'history.db')
+    _seed(db_path)
+
+    assert script_history.count_matches('AAA', db_path=db_path) == 3
+    assert script_history.count_matches('aaa ', col=1, db_path=db_path) == 2
+    assert script_history.count_matches('AAA', since='2026-10-01', db_path=db_path) == 2
+    assert script_history.count_matches('AAA', col=1, since='2026-10-01', until='2026-10-01', db_path=db_path) == 1
+    assert script_history.count_matches('BBB', since='2026-10-01', db_path=db_path) == 0
+
+    assert script_history.symbol_history('bbb', db_path=db_path) == [
+        ('2026-09-30', '09:45:00', 1, 1, None),
+        ('2026-10-01', '09:45:00', 1, 0, 'VOLUME'),
+    ]
+    assert script_history.top_symbols(col=1, db_path=db_path) == [('AAA', 2), ('BBB', 1)]
+    assert script_history.top_symbols(limit=1, db_path=db_path) == [('AAA', 3)]
+
+
+def test_cli(tmp_path, capsys):
+    db_path = str(tmp_path / 'history.db')
+    _seed(db_path)
+
+    script_history.main(['--db', db_path, 'count', 'aaa', '--column', '1'])
+    assert capsys.readouterr().out == "AAA matched 2 time(s)\n"
+
+    script_history.main(['--db', db_path, 'history', 'BBB', '--since', '2026-10-01'])
+    assert capsys.readouterr().out == "2026-10-01 09:45:00 column 1: VOLUME\n"
+
+    script_history.main(['--db', db_path, 'top', '--limit', '2'])
+    assert capsys.readouterr().out == "AAA: 3\nBBB: 1\n"
@@ -0,0 +1,71 @@
+import openpyxl
+
+import script_main
+
+
+def edit_input_file(cells, delete_rows_from=None):
+    workbook = openpyxl.load_workbook(script_main.input_excel_file_path)
+    for cell, value in cells.items():
+        workbook.active[cell] = value
+    if delete_rows_from is not None:
+        workbook.active.delete_rows(delete_rows_from, workbook.active.max_row)
+    workbook.save(script_main.input_excel_file_path)
+
+
+def test_bad_filter_expression_is_reported_when_loading(scanner, capsys):
+    edit_input_file({'D12': 'price >> 1', 'E12': 'changesPercentage > 1'})
+
+    config = script_main.load_scan_config(script_main.input_excel_file_path)
+
+    output = capsys.readouterr().out
+    assert "Error in settings for column 1: Unsupported syntax in filter expression 'price >> 1'" in output
+    assert 3 not in config.columns
+    assert config.columns[4].filter_expression.expression == 'changesPercentage > 1'
+
+
+def quote(symbol, volume):
+    return {'symbol': symbol, 'name': f'{symbol} Corp', 'price': 12.0, 'volume': volume, 'avgVolume': 10000.0, 'timestamp': 0}
+
+
+def column_results(col):
+    output_df = script_main.output_writer.latest_snapshot(script_main.output_excel_file_path)
+    return output_df.iloc[18:, col].dropna().tolist()
+
+
+def test_ranked_columns_keep_earlier_results_in_place(scanner):
+    # Sheets saved before the Rank By row existed stop at row 17, one short of the
+    # configuration rows; ranking then uses the default ratio
+    edit_input_file({'D15': 2, 'E15': 2, 'F15': 3}, delete_rows_from=18)
+    scanner.api_data = [quote('CCC', 30000), quote('AAA', 90000), quote('DDD', 20000), quote('BBB', 60000)]
+    config = script_main.load_scan_config(script_main.input_excel_file_path)
+    assert len(config.input_df) == 17
+
+    script_main.process_column(3)
+    assert column_results(3) == ['AAA', 'BBB']
+
+    script_main.process_column(4)
+    script_main.process_column(5)
+    assert column_results(3) == ['AAA', 'BBB']
+    assert column_results(4) == ['AAA', 'BBB']
+    assert column_results(5) == ['AAA', 'BBB', 'CCC']
+
+    # Merging against the workbook on disk keeps the same rows
+    script_main.output_writer.close()
+    script_main.output_writer.forget(script_main.output_excel_file_path)
+    script_main.process_column(4)
+    output_df = script_main.output_writer.latest_snapshot(script_main.output_excel_file_path)
+    assert output_df.iloc[18:20, 3].tolist() == ['AAA', 'BBB']
+    assert output_df.iloc[18:21, 5].tolist() == ['AAA', 'BBB', 'CCC']
+    assert output_df.iloc[:18, 3].tolist() == config.input_df.iloc[:18, 3].reindex(range(18)).tolist()
+
+
+def test_name_exclusion_log_names_the_matched_word(scanner):
+    scanner.api_data = [quote('AAA', 90000), dict(quote('FFF', 90000), name='Global Income Fund')]
+    script_main.load_scan_config(script_main.input_excel_file_path)
+
+    script_main.process_column(3)
+
+    assert column_results(3) == ['AAA']
+    with open('Logs/excluded_symbols_column_1.txt') as log:
+        lines = log.read().splitlines()
+    assert lines[2:] == ["Symbol: FFF, Reason: Symbol 'FFF' matches exclusion list (word 'fund' matched). Dropping symbol."]
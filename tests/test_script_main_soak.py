@@ -0,0 +1,66 @@
+import gc
+import os
+
+import pytest
+import schedule
+
+import script_main
+
+# Large enough that keeping one day's snapshot alive per day shows up in RSS
+SYMBOL_COUNT = 10000
+WARMUP_DAYS = 3
+SOAK_DAYS = 8
+RSS_TOLERANCE = 12 * 1024 * 1024
+
+
+def current_rss():
+    """Resident set size of this process in bytes."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        pytest.skip("RSS is not available without psutil or /proc")
+
+
+def run_day(state):
+    script_main.load_scan_config(script_main.input_excel_file_path)
+    for col in (3, 4, 5):
+        script_main.process_column(col)
+    script_main.output_writer.close()
+    state.day += 1
+    script_main.daily_save_and_restart()
+    gc.collect()
+
+
+def test_rss_stays_flat_across_simulated_days(scanner):
+    scanner.symbol_count = SYMBOL_COUNT
+    writer = script_main.output_writer
+
+    # Warm up caches and allocator arenas (pandas, openpyxl, interned strings) before measuring
+    for _ in range(WARMUP_DAYS):
+        run_day(scanner)
+    jobs = len(schedule.jobs)
+    baseline = current_rss()
+
+    for _ in range(SOAK_DAYS):
+        run_day(scanner)
+        assert len(writer.latest) <= 1
+        assert len(writer.saved_paths) <= 1
+        assert len(script_main.rolling_store.index) == 0
+        assert len(schedule.jobs) == jobs
+    growth = current_rss() - baseline
+
+    assert growth < RSS_TOLERANCE, f"RSS grew by {growth} bytes over {SOAK_DAYS} simulated days"
+    assert os.path.exists(f'day{WARMUP_DAYS + SOAK_DAYS - 1:03d}_VOLvsAVGVOL.xlsx')
+
+
+def test_rolling_store_does_not_grow_within_a_day(scanner):
+    script_main.load_scan_config(script_main.input_excel_file_path)
+    for _ in range(5):
+        script_main.process_column(3)
+    assert len(script_main.rolling_store.index) == scanner.symbol_count
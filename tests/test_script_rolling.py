@@ -0,0 +1,103 @@
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import script_rolling
+
+# Half way through the regular session, so relVolume divides by half a day
+T0 = datetime(2026, 10, 19, 12, 45, tzinfo=script_rolling.MARKET_TZ).timestamp()
+# With this average the average day's pace is exactly one share per minute
+AVG = 390.0
+
+
+def feed(store, quotes, minutes):
+    symbols = np.array(list(quotes), dtype=object)
+    volume = np.array([quotes[symbol] for symbol in quotes], dtype=float)
+    price = volume / 100
+    rows = store.update(symbols, volume, price, np.full(len(symbols), AVG), T0 + minutes * 60)
+    metrics = store.metrics_for(rows)
+    return {symbol: {field: values[i] for field, values in metrics.items()} for i, symbol in enumerate(quotes)}
+
+
+def test_session_fraction_is_clamped():
+    assert script_rolling.session_fraction(T0) == pytest.approx(0.5)
+    assert script_rolling.session_fraction(T0 - 5 * 3600) == pytest.approx(15 / 390)
+    assert script_rolling.session_fraction(T0 + 6 * 3600) == 1
+
+
+def test_first_snapshot_has_only_relative_volume():
+    store = script_rolling.RollingVolumeStore(capacity=3)
+    metrics = feed(store, {'A': 195.0}, 0)['A']
+    assert metrics['relVolume'] == pytest.approx(1.0)
+    assert math.isnan(metrics['volumeVelocity'])
+    assert math.isnan(metrics['volumeAcceleration'])
+    assert math.isnan(metrics['priceVelocity'])
+
+
+def test_metrics_use_the_whole_window_after_wraparound():
+    store = script_rolling.RollingVolumeStore(capacity=3)
+    for minute, volume in enumerate([100.0, 200.0, 300.0, 500.0]):
+        feed(store, {'A': volume}, minute)
+    metrics = feed(store, {'A': 800.0}, 4)['A']
+
+    assert store.count == 3
+    assert store.head == 4 % 3
+    assert sorted(store.volume[0]) == [300.0, 500.0, 800.0]
+    # Oldest kept sample is 300 at minute 2
+    assert metrics['volumeVelocity'] == pytest.approx(250.0)
+    # Last minute traded 300 against 250 per minute over the window
+    assert metrics['volumeAcceleration'] == pytest.approx(50.0)
+    # Price went from 3.0 to 8.0 over two minutes
+    assert metrics['priceVelocity'] == pytest.approx((8.0 - 3.0) / 3.0 * 100 / 2)
+
+
+def test_snapshot_within_min_interval_replaces_latest_slot():
+    store = script_rolling.RollingVolumeStore(capacity=3)
+    feed(store, {'A': 100.0}, 0)
+    feed(store, {'A': 160.0}, 1)
+    metrics = feed(store, {'A': 190.0}, 1 + 2 / 60)['A']
+
+    assert store.count == 2
+    assert store.times[store.head] == pytest.approx(T0 + 62)
+    assert metrics['volumeVelocity'] == pytest.approx(90.0 * 60 / 62)
+    # Only one interval left in the window, so there is nothing to accelerate against
+    assert math.isnan(metrics['volumeAcceleration'])
+
+
+def test_symbol_appearing_mid_day():
+    store = script_rolling.RollingVolumeStore(capacity=4)
+    feed(store, {'A': 100.0}, 0)
+    feed(store, {'A': 200.0}, 1)
+    metrics = feed(store, {'B': 50.0, 'A': 300.0}, 2)
+    assert math.isnan(metrics['B']['volumeVelocity'])
+    assert metrics['A']['volumeVelocity'] == pytest.approx(100.0)
+
+    metrics = feed(store, {'A': 400.0, 'B': 80.0}, 3)
+    assert metrics['B']['volumeVelocity'] == pytest.approx(30.0)
+    assert metrics['A']['volumeVelocity'] == pytest.approx(100.0)
+    assert list(store.index) == ['A', 'B']
+
+
+def test_feed_counter_reset_gives_nan_velocity():
+    store = script_rolling.RollingVolumeStore(capacity=3)
+    feed(store, {'A': 1000.0}, 0)
+    feed(store, {'A': 1500.0}, 1)
+    metrics = feed(store, {'A': 200.0}, 2)['A']
+    assert math.isnan(metrics['volumeVelocity'])
+    assert math.isnan(metrics['volumeAcceleration'])
+    assert math.isnan(metrics['priceVelocity'])
+
+    # Only samples after the reset count from then on
+    metrics = feed(store, {'A': 260.0}, 3)['A']
+    assert metrics['volumeVelocity'] == pytest.approx(60.0)
+
+
+def test_reset_forgets_symbols():
+    store = script_rolling.RollingVolumeStore(capacity=3)
+    feed(store, {'A': 100.0, 'B': 100.0}, 0)
+    store.reset()
+    assert len(store.index) == 0
+    assert store.count == 0
+    assert store.volume.shape == (0, 3)
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+import script_writer
+
+
+def test_locked_target_goes_to_versioned_sibling(tmp_path, monkeypatch):
+    target = str(tmp_path / '20260101_VOLvsAVGVOL.xlsx')
+    real_replace = os.replace
+    real_to_excel = pd.DataFrame.to_excel
+    gate = threading.Event()
+    attempts = []
+    written = []
+
+    def locked_replace(src, dst):
+        attempts.append(dst)
+        gate.wait(5)
+        if dst == target:
+            raise PermissionError(f"[Errno 13] Permission denied: '{dst}'")
+        real_replace(src, dst)
+
+    def counting_to_excel(self, *args, **kwargs):
+        written.append(int(self.iloc[0, 0]))
+        return real_to_excel(self, *args, **kwargs)
+
+    monkeypatch.setattr(script_writer.os, 'replace', locked_replace)
+    monkeypatch.setattr(pd.DataFrame, 'to_excel', counting_to_excel)
+
+    writer = script_writer.ExcelWriteBehind()
+    # Holding the condition keeps the writer thread from picking anything up,
+    # so all three submits are pending together
+    start = time.monotonic()
+    with writer.condition:
+        for value in (1, 2, 3):
+            writer.submit(pd.DataFrame({'symbol': [value]}), target)
+    assert time.monotonic() - start < 0.5
+
+    # While a write is stuck on the locked file, submit still returns at once
+    deadline = time.monotonic() + 5
+    while not attempts and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert attempts == [target]
+    start = time.monotonic()
+    writer.submit(pd.DataFrame({'symbol': [4]}), target)
+    assert time.monotonic() - start < 0.5
+
+    gate.set()
+    writer.close(timeout=10)
+
+    sibling = str(tmp_path / '20260101_VOLvsAVGVOL_2.xlsx')
+    assert written == [3, 4]
+    assert writer.saved_paths[target] == sibling
+    assert not os.path.exists(target)
+    assert pd.read_excel(sibling)['symbol'].tolist() == [4]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp.xlsx')]
+
+
+def test_next_versioned_path_skips_existing(tmp_path):
+    target = tmp_path / 'out.xlsx'
+    (tmp_path / 'out_2.xlsx').write_bytes(b'')
+    assert script_writer.next_versioned_path(str(target)) == str(tmp_path / 'out_3.xlsx')
+
+
+def test_forget_releases_target_after_pending_write(tmp_path, monkeypatch):
+    target = str(tmp_path / 'out.xlsx')
+    real_replace = os.replace
+    gate = threading.Event()
+    started = threading.Event()
+
+    def slow_replace(src, dst):
+        started.set()
+        gate.wait(5)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(script_writer.os, 'replace', slow_replace)
+
+    writer = script_writer.ExcelWriteBehind()
+    writer.submit(pd.DataFrame({'symbol': [1]}), target)
+    assert started.wait(5)
+    # Forgetting while the write is in progress keeps the snapshot until it is done
+    writer.forget(target)
+    assert writer.latest_snapshot(target) is not None
+    gate.set()
+    writer.close(timeout=10)
+
+    assert os.path.exists(target)
+    assert writer.latest == {}
+    assert writer.saved_paths == {}
+    assert writer.forgotten == set()
+
+    # A target that was written and is idle is dropped at once
+    writer.submit(pd.DataFrame({'symbol': [2]}), target)
+    writer.close(timeout=10)
+    assert writer.saved_paths == {target: target}
+    writer.forget(target)
+    assert writer.latest == {}
+    assert writer.saved_paths == {}